@@ -1,8 +1,42 @@
+from pathlib import Path
+
+import matplotlib
 import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
+import numpy as np
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import Patch, Rectangle
+
+
+try:
+    from matplotlib.backends import backend_registry
+except ImportError:  # matplotlib < 3.9
+    backend_registry = None
+
 
+def _can_show_figures():
+    """
+    Whether plt.show() would display anything with the active backend.
 
-def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.png"):
+    True in interactive mode (e.g. Jupyter's inline backend) or when the
+    backend drives a GUI framework; False for file-only backends like Agg.
+    """
+    if plt.isinteractive():
+        return True
+    backend = matplotlib.get_backend()
+    if backend_registry is None:
+        return backend.lower() not in matplotlib.rcsetup.non_interactive_bk
+    _, gui_framework = backend_registry.resolve_backend(backend)
+    return gui_framework is not None
+
+
+def plot_schedule(
+    entries,
+    students,
+    days,
+    periods,
+    output_path="schedule_gantt.png",
+    show=None,
+):
     """
     Draw a cleaner Gantt-like chart for a school schedule.
 
@@ -11,6 +45,8 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
     days: list like ["Mon", "Tue", ...]
     periods: iterable like range(5)
     output_path: where to save the PNG
+    show: display the figure after saving; None means only when the
+        matplotlib backend is interactive (e.g. not when running headless)
     """
     if not entries:
         print("No entries to plot.")
@@ -20,8 +56,11 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
     period_count = len(periods)
     total_slots = len(days) * period_count
 
+    # Split entries into columns once; everything below works per column
+    entry_students, day_col, period_col, subject_col, room_col = zip(*entries)
+
     # --- Room colors ---
-    unique_rooms = sorted({room for _, _, _, _, room in entries})
+    unique_rooms = np.unique(room_col).tolist()
     cmap = plt.get_cmap("tab10")
     room_colors = {
         room: cmap(i % 10)
@@ -47,22 +86,33 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
         y_labels.append(student)
 
     # --- Draw lesson blocks ---
-    for student, day_idx, period_idx, subject, room in entries:
-        start = day_idx * period_count + period_idx
-        color = room_colors[room]
-
-        ax.broken_barh(
-            [(start, 1)],
-            (y_map[student], row_height),
-            facecolors=color,
+    # Block geometry is computed per column and all blocks go into one
+    # collection instead of one artist per lesson
+    starts = np.array(day_col) * period_count + np.array(period_col)
+    ys = np.array([y_map[student] for student in entry_students])
+    block_colors = [room_colors[room] for room in room_col]
+
+    blocks = [
+        Rectangle((start, y), 1, row_height)
+        for start, y in zip(starts, ys)
+    ]
+    # Rasterizing keeps vector outputs (PDF/SVG) to one image for all blocks.
+    ax.add_collection(
+        PatchCollection(
+            blocks,
+            facecolors=block_colors,
             edgecolors="black",
             linewidth=1.0,
+            rasterized=True,
         )
+    )
 
-        # If you want less clutter, keep only subject here
-        ax.text(
-            start + 0.5,
-            y_map[student] + row_height / 2,
+    # If you want less clutter, keep only subject here
+    text = ax.text
+    for x, y, subject in zip(starts + 0.5, ys + row_height / 2, subject_col):
+        text(
+            x,
+            y,
             f"{subject}",
             ha="center",
             va="center",
@@ -73,8 +123,7 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
     # --- Grid / slot boundaries ---
     # Major ticks = slot boundaries (0,1,2,3...), used for grid lines
     boundaries = list(range(total_slots + 1))
-    ax.set_xticks(boundaries)
-    ax.set_xticklabels([])
+    ax.set_xticks(boundaries, labels=[])
 
     # Minor ticks = centers of slots, used for labels
     centers = [i + 0.5 for i in range(total_slots)]
@@ -83,20 +132,26 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
         for period_idx in periods:
             center_labels.append(f"{day_name}\nP{period_idx + 1}")
 
-    ax.set_xticks(centers, minor=True)
-    ax.set_xticklabels(center_labels, minor=True, rotation=90)
+    ax.set_xticks(centers, labels=center_labels, minor=True)
+    ax.tick_params(axis="x", which="minor", labelrotation=90)
 
     # Grid on slot boundaries
     ax.grid(axis="x", which="major", linestyle="-", linewidth=0.8, alpha=0.35)
     ax.grid(axis="y", which="major", linestyle="-", linewidth=0.8, alpha=0.35)
 
+    top_y = max(y_map.values()) + row_height + 4
+
     # --- Thicker lines between days ---
-    for day_idx in range(len(days) + 1):
-        x = day_idx * period_count
-        ax.axvline(x=x, color="black", linewidth=2.0, alpha=0.7)
+    ax.vlines(
+        [day_idx * period_count for day_idx in range(len(days) + 1)],
+        8,
+        top_y + 3,
+        colors="black",
+        linewidth=2.0,
+        alpha=0.7,
+    )
 
     # --- Optional: day labels above chart ---
-    top_y = max(y_map.values()) + row_height + 4
     for day_idx, day_name in enumerate(days):
         center_x = day_idx * period_count + period_count / 2
         ax.text(
@@ -110,8 +165,7 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
         )
 
     # --- Y axis ---
-    ax.set_yticks(y_ticks)
-    ax.set_yticklabels(y_labels)
+    ax.set_yticks(y_ticks, labels=y_labels)
 
     # --- Limits / labels ---
     ax.set_xlim(0, total_slots)
@@ -132,6 +186,21 @@ def plot_schedule(entries, students, days, periods, output_path="schedule_gantt.
     )
 
     plt.tight_layout()
-    plt.savefig(output_path, dpi=200, bbox_inches="tight")
+    # Flat-color blocks compress well anyway; a low zlib level keeps PNG
+    # encoding cheap. Vector formats do not accept PIL options. Like savefig,
+    # a path without a suffix is written in the default savefig.format.
+    output_format = (
+        Path(output_path).suffix[1:] or plt.rcParams["savefig.format"]
+    )
+    save_kwargs = {}
+    if output_format.lower() == "png":
+        save_kwargs["pil_kwargs"] = {"compress_level": 1, "optimize": False}
+    plt.savefig(output_path, dpi=200, bbox_inches="tight", **save_kwargs)
     print(f"Chart saved to: {output_path}")
-    plt.show()
\ No newline at end of file
+
+    if show is None:
+        show = _can_show_figures()
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
@@ -1,3 +1,5 @@
+from itertools import product
+
 from ortools.sat.python import cp_model
 from plot_schedule import plot_schedule
 
@@ -33,9 +35,13 @@ subject_hours = {
     "E": 1
 }
 
+# Index helpers reused by every model-building loop below
+day_indices = range(len(days))
+room_names = list(rooms.values())
+
 # --- Quick sanity check before solving ---
 required_A_lessons = len(students) * subject_hours["A"]   # 3 * 2 = 6
-t1_capacity = len(list(periods))  # only Tuesday => 5 periods
+t1_capacity = len(periods)  # only Tuesday => 5 periods
 
 print("Quick sanity check:")
 print(f"Required A lessons: {required_A_lessons}")
@@ -45,91 +51,87 @@ if required_A_lessons > t1_capacity:
     print("WARNING: Model is likely INFEASIBLE because T1 can only teach on Tuesday.\n")
 
 # --- Decision Variables ---
+# Variables are only ever looked up through x, so CP-SAT names are left empty
 x = {}
-for s in students:
-    for subj in subjects:
-        for d in range(len(days)):
-            for p in periods:
-                for r in rooms.values():
-                    x[(s, subj, d, p, r)] = model.NewBoolVar(
-                        f"{s}_{subj}_{d}_{p}_{r}"
-                    )
+new_bool_var = model.NewBoolVar
+for s, subj, d, p, r in product(
+    students, subjects, day_indices, periods, room_names
+):
+    x[(s, subj, d, p, r)] = new_bool_var("")
 
 # --- 1. Each student gets correct weekly hours per subject ---
-for s in students:
-    for subj in subjects:
-        model.Add(
-            sum(
-                x[(s, subj, d, p, r)]
-                for d in range(len(days))
-                for p in periods
-                for r in rooms.values()
-            ) == subject_hours[subj]
-        )
+for s, subj in product(students, subjects):
+    model.Add(
+        sum(
+            x[(s, subj, d, p, r)]
+            for d, p, r in product(day_indices, periods, room_names)
+        ) == subject_hours[subj]
+    )
 
-# --- 2. A student cannot have two lessons at same time ---
-for s in students:
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for subj in subjects
-                    for r in rooms.values()
-                ) <= 1
+# --- 1b. Redundant: total lessons per subject across all students ---
+# Implied by constraint 1, but lets the solver rule out a subject's slots as
+# soon as its total is reached (e.g. T1's lessons of A).
+for subj in subjects:
+    model.Add(
+        sum(
+            x[(s, subj, d, p, r)]
+            for s, d, p, r in product(
+                students, day_indices, periods, room_names
             )
+        ) == len(students) * subject_hours[subj]
+    )
+
+# --- 2. A student cannot have two lessons at same time ---
+for s, d, p in product(students, day_indices, periods):
+    model.AddAtMostOne(
+        [
+            x[(s, subj, d, p, r)]
+            for subj, r in product(subjects, room_names)
+        ]
+    )
 
 # --- 3. Room cannot host two classes at same time ---
-for r in rooms.values():
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for s in students
-                    for subj in subjects
-                ) <= 1
-            )
+for r, d, p in product(room_names, day_indices, periods):
+    model.AddAtMostOne(
+        [
+            x[(s, subj, d, p, r)]
+            for s, subj in product(students, subjects)
+        ]
+    )
 
 # --- 4. Teacher cannot teach two classes at same time ---
-for subj in subjects:
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for s in students
-                    for r in rooms.values()
-                ) <= 1
-            )
+for subj, d, p in product(subjects, day_indices, periods):
+    model.AddAtMostOne(
+        [
+            x[(s, subj, d, p, r)]
+            for s, r in product(students, room_names)
+        ]
+    )
 
 # --- 5. Teacher 1 only works Tuesday ---
 tuesday_index = 1
-for s in students:
-    for subj in subjects:
-        if teachers[subj] == "T1":
-            for d in range(len(days)):
-                if d != tuesday_index:
-                    for p in periods:
-                        for r in rooms.values():
-                            model.Add(x[(s, subj, d, p, r)] == 0)
+t1_subjects = [subj for subj in subjects if teachers[subj] == "T1"]
+t1_off_days = [d for d in day_indices if d != tuesday_index]
+for s, subj, d, p, r in product(
+    students, t1_subjects, t1_off_days, periods, room_names
+):
+    model.Add(x[(s, subj, d, p, r)] == 0)
 
 # --- Soft Constraint: Prefer dedicated room ---
-penalties = []
-for s in students:
-    for subj in subjects:
-        preferred_room = rooms[subj]
-        for d in range(len(days)):
-            for p in periods:
-                for r in rooms.values():
-                    if r != preferred_room:
-                        penalties.append(x[(s, subj, d, p, r)])
+# The number of lessons is fixed by constraint 1, so counting lessons held in
+# their dedicated room is enough: misplaced = total - preferred.
+total_lessons = len(students) * sum(subject_hours.values())
+preferred = [
+    x[(s, subj, d, p, rooms[subj])]
+    for s, subj, d, p in product(students, subjects, day_indices, periods)
+]
 
-model.Minimize(sum(penalties))
+model.Minimize(total_lessons - sum(preferred))
 
 # --- Solve ---
 solver = cp_model.CpSolver()
 solver.parameters.max_time_in_seconds = 10
+solver.parameters.num_workers = 8
 solver.parameters.log_search_progress = True
 
 status = solver.Solve(model)
@@ -145,20 +147,25 @@ status_name = {
 print("\nSolver status:", status_name)
 
 if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+    # Collect the printed schedule and write it out in one go
     entries = []
+    lines = []
     for s in students:
-        print(f"\nSchedule for {s}")
-        for d in range(len(days)):
+        lines.append(f"\nSchedule for {s}")
+        for d in day_indices:
             for p in periods:
                 found = False
                 for subj in subjects:
-                    for r in rooms.values():
+                    for r in room_names:
                         if solver.Value(x[(s, subj, d, p, r)]):
-                            print(f"{days[d]} Period {p+1}: {subj} in {r}")
+                            lines.append(
+                                f"{days[d]} Period {p+1}: {subj} in {r}"
+                            )
                             entries.append((s, d, p, subj, r))
                             found = True
                 if not found:
-                    print(f"{days[d]} Period {p+1}: ---")
+                    lines.append(f"{days[d]} Period {p+1}: ---")
+    print("\n".join(lines))
 
     plot_schedule(
         entries=entries,
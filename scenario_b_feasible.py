@@ -1,8 +1,14 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from itertools import product
+from pathlib import Path
+
+import numpy as np
 from ortools.sat.python import cp_model
 from plot_schedule import plot_schedule
 
-model = cp_model.CpModel()
-
 # --- Data ---
 students = ["S1", "S2", "S3"]
 subjects = ["A", "B", "C", "D", "E"]
@@ -33,130 +39,234 @@ subject_hours = {
     "E": 1
 }
 
+# Index helpers reused by every model-building loop below
+day_indices = range(len(days))
+room_names = list(rooms.values())
+
 # --- Quick sanity check before solving ---
 required_A_lessons = len(students) * subject_hours["A"]   # 3 * 2 = 6
 allowed_days_t1 = [1, 2]  # Tuesday, Wednesday
 
-t1_capacity = len(list(periods)) * len(allowed_days_t1)
+t1_capacity = len(periods) * len(allowed_days_t1)
 
 print("Quick sanity check:")
 print(f"Required A lessons: {required_A_lessons}")
 print(f"T1 capacity on allowed days: {t1_capacity}")
 
-# --- Decision Variables ---
-x = {}
-for s in students:
-    for subj in subjects:
-        for d in range(len(days)):
-            for p in periods:
-                for r in rooms.values():
-                    x[(s, subj, d, p, r)] = model.NewBoolVar(
-                        f"{s}_{subj}_{d}_{p}_{r}"
-                    )
+def solve_schedule():
+    """
+    Build and solve the CP-SAT model for the data above.
 
-# --- 1. Each student gets correct weekly hours per subject ---
-for s in students:
-    for subj in subjects:
+    Returns (status, assigned) where assigned maps (student, day, period) to
+    (subject, room), or is None when the solver found no schedule.
+    """
+    model = cp_model.CpModel()
+
+    # --- Decision Variables ---
+    # x[(s, subj, d, p)] is 1 when student group s has subject subj in that
+    # slot, room_of[(s, subj, d, p)] is the index of the room it is held in.
+    # An unused lesson takes its own "idle" value past the real rooms, so the
+    # room constraint below can be a plain AllDifferent per slot.
+    # Teacher 1 only works Tuesday and Wednesday, so lessons taught by T1 on
+    # other days are never created instead of being created and forced to 0.
+    # Variables are only ever looked up through x / room_of, so CP-SAT names
+    # are left empty.
+    x = {}
+    room_of = {}
+    idle_rooms = {}
+    new_bool_var = model.NewBoolVar
+    new_int_var_from_domain = model.NewIntVarFromDomain
+    next_idle_room = len(room_names)
+    for s, subj in product(students, subjects):
+        idle_room = next_idle_room
+        next_idle_room += 1
+        idle_rooms[(s, subj)] = idle_room
+        room_domain = cp_model.Domain.FromValues(
+            list(range(len(room_names))) + [idle_room]
+        )
+        for d, p in product(day_indices, periods):
+            if teachers[subj] == "T1" and d not in allowed_days_t1:
+                continue
+            lesson = new_bool_var("")
+            room = new_int_var_from_domain(room_domain, "")
+            model.Add(room < len(room_names)).OnlyEnforceIf(lesson)
+            model.Add(room == idle_room).OnlyEnforceIf(lesson.Not())
+            x[(s, subj, d, p)] = lesson
+            room_of[(s, subj, d, p)] = room
+
+    # --- 1. Each student gets correct weekly hours per subject ---
+    for s, subj in product(students, subjects):
         model.Add(
             sum(
-                x[(s, subj, d, p, r)]
-                for d in range(len(days))
-                for p in periods
-                for r in rooms.values()
+                x[(s, subj, d, p)]
+                for d, p in product(day_indices, periods)
+                if (s, subj, d, p) in x
             ) == subject_hours[subj]
         )
 
-# --- 2. A student cannot have two lessons at same time ---
-for s in students:
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for subj in subjects
-                    for r in rooms.values()
-                ) <= 1
-            )
-
-# --- 3. Room cannot host two classes at same time ---
-for r in rooms.values():
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for s in students
-                    for subj in subjects
-                ) <= 1
-            )
-
-# --- 4. Teacher cannot teach two classes at same time ---
-for subj in subjects:
-    for d in range(len(days)):
-        for p in periods:
-            model.Add(
-                sum(
-                    x[(s, subj, d, p, r)]
-                    for s in students
-                    for r in rooms.values()
-                ) <= 1
-            )
-
-# --- 5. Teacher 1 only works Tuesday and Wednesday ---
-for s in students:
-    for subj in subjects:
-        if teachers[subj] == "T1":
-            for d in range(len(days)):
-                if d not in allowed_days_t1:
-                    for p in periods:
-                        for r in rooms.values():
-                            model.Add(x[(s, subj, d, p, r)] == 0)
-
-# --- Soft Constraint: Prefer dedicated room ---
-penalties = []
-for s in students:
+    # --- 1b. Redundant: total lessons per subject across all students ---
+    # Implied by constraint 1, but lets the solver rule out a subject's slots
+    # as soon as its total is reached (e.g. T1's lessons of A).
     for subj in subjects:
-        preferred_room = rooms[subj]
-        for d in range(len(days)):
-            for p in periods:
-                for r in rooms.values():
-                    if r != preferred_room:
-                        penalties.append(x[(s, subj, d, p, r)])
+        model.Add(
+            sum(
+                x[(s, subj, d, p)]
+                for s, d, p in product(students, day_indices, periods)
+                if (s, subj, d, p) in x
+            ) == len(students) * subject_hours[subj]
+        )
+
+    # --- 2. A student cannot have two lessons at same time ---
+    for s, d, p in product(students, day_indices, periods):
+        model.AddAtMostOne(
+            [x[(s, subj, d, p)] for subj in subjects if (s, subj, d, p) in x]
+        )
 
-model.Minimize(sum(penalties))
+    # --- 3. Room cannot host two classes at same time ---
+    for d, p in product(day_indices, periods):
+        model.AddAllDifferent(
+            [
+                room_of[(s, subj, d, p)]
+                for s, subj in product(students, subjects)
+                if (s, subj, d, p) in room_of
+            ]
+        )
+
+    # --- 4. Teacher cannot teach two classes at same time ---
+    for subj, d, p in product(subjects, day_indices, periods):
+        model.AddAtMostOne(
+            [x[(s, subj, d, p)] for s in students if (s, subj, d, p) in x]
+        )
+
+    # --- Soft Constraint: Prefer dedicated room ---
+    # The number of lessons is fixed by constraint 1, so counting lessons held
+    # in their dedicated room is enough: misplaced = total - preferred. A
+    # lesson that does not take place sits in its idle room, so it never
+    # counts as preferred.
+    total_lessons = len(students) * sum(subject_hours.values())
+    preferred = {}
+    for (s, subj, d, p), room in room_of.items():
+        in_preferred = new_bool_var("")
+        model.Add(
+            room == room_names.index(rooms[subj])
+        ).OnlyEnforceIf(in_preferred)
+        preferred[(s, subj, d, p)] = in_preferred
+
+    model.Minimize(total_lessons - sum(preferred.values()))
+
+    # --- Solution hint: greedy first-fit schedule ---
+    # Put each lesson in the earliest slot where the student, the teacher and
+    # the subject's dedicated room are all free, so the search starts from a
+    # good incumbent instead of from scratch.
+    busy = set()
+    hinted = set()
+    for s, subj in product(students, subjects):
+        placed = 0
+        for d, p in product(day_indices, periods):
+            if placed == subject_hours[subj]:
+                break
+            slot_needs = {
+                ("student", s, d, p),
+                ("teacher", teachers[subj], d, p),
+                ("room", rooms[subj], d, p),
+            }
+            if (s, subj, d, p) not in x or busy & slot_needs:
+                continue
+            busy |= slot_needs
+            hinted.add((s, subj, d, p))
+            placed += 1
+
+    for key, lesson in x.items():
+        s, subj, d, p = key
+        if key in hinted:
+            room_hint = room_names.index(rooms[subj])
+        else:
+            room_hint = idle_rooms[(s, subj)]
+        model.AddHint(lesson, key in hinted)
+        model.AddHint(room_of[key], room_hint)
+        model.AddHint(preferred[key], key in hinted)
 
-# --- Solve ---
-solver = cp_model.CpSolver()
-solver.parameters.max_time_in_seconds = 10
-solver.parameters.log_search_progress = True
+    # --- Solve ---
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 10
+    solver.parameters.num_workers = 8
+    solver.parameters.log_search_progress = True
+
+    status = solver.Solve(model)
+
+    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        return status, None
+
+    # Read all decision variables in one call, keep only the active ones
+    x_keys = list(x)
+    x_values = solver.BooleanValues(list(x.values())).to_numpy()
+    room_values = solver.Values(list(room_of.values())).to_numpy()
+    assigned = {}
+    for i in np.flatnonzero(x_values):
+        s, subj, d, p = x_keys[i]
+        assigned[(s, d, p)] = (subj, room_names[room_values[i]])
+    return status, assigned
+
+
+# --- Cached result ---
+# This script holds both the data and the model, so hashing its source keys
+# the cache: any edit to the inputs, constraints, objective or hint makes
+# the next run solve again instead of replaying an old schedule.
+cache_key = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+cache_path = Path(__file__).parent / ".cache" / f"{cache_key}.pkl"
+
+cached = False
+if cache_path.exists():
+    try:
+        with cache_path.open("rb") as f:
+            assigned = pickle.load(f)
+        cached = True
+    except (EOFError, pickle.UnpicklingError):
+        print(f"\nIgnoring unreadable cache file: {cache_path}")
+
+if cached:
+    print(f"\nLoaded cached schedule: {cache_path}")
+    print("\nSolver status: OPTIMAL (cached)")
+else:
+    status, assigned = solve_schedule()
 
-status = solver.Solve(model)
+    status_name = {
+        cp_model.OPTIMAL: "OPTIMAL",
+        cp_model.FEASIBLE: "FEASIBLE",
+        cp_model.INFEASIBLE: "INFEASIBLE",
+        cp_model.MODEL_INVALID: "MODEL_INVALID",
+        cp_model.UNKNOWN: "UNKNOWN",
+    }.get(status, str(status))
 
-status_name = {
-    cp_model.OPTIMAL: "OPTIMAL",
-    cp_model.FEASIBLE: "FEASIBLE",
-    cp_model.INFEASIBLE: "INFEASIBLE",
-    cp_model.MODEL_INVALID: "MODEL_INVALID",
-    cp_model.UNKNOWN: "UNKNOWN",
-}.get(status, str(status))
+    print("\nSolver status:", status_name)
 
-print("\nSolver status:", status_name)
+    # Only a proven optimum is worth reusing on later runs
+    if status == cp_model.OPTIMAL:
+        # Write to a temporary file and move it into place, so an interrupted
+        # run never leaves a truncated pickle under the cache name
+        cache_path.parent.mkdir(exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=cache_path.parent, suffix=".tmp", delete=False
+        ) as f:
+            pickle.dump(assigned, f)
+        os.replace(f.name, cache_path)
 
-if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+if assigned is not None:
+    # Collect the printed schedule and write it out in one go
     entries = []
+    lines = []
     for s in students:
-        print(f"\nSchedule for {s}")
-        for d in range(len(days)):
+        lines.append(f"\nSchedule for {s}")
+        for d in day_indices:
             for p in periods:
-                found = False
-                for subj in subjects:
-                    for r in rooms.values():
-                        if solver.Value(x[(s, subj, d, p, r)]):
-                            print(f"{days[d]} Period {p+1}: {subj} in {r}")
-                            entries.append((s, d, p, subj, r))
-                            found = True
-                if not found:
-                    print(f"{days[d]} Period {p+1}: ---")
+                lesson = assigned.get((s, d, p))
+                if lesson is None:
+                    lines.append(f"{days[d]} Period {p+1}: ---")
+                    continue
+                subj, r = lesson
+                lines.append(f"{days[d]} Period {p+1}: {subj} in {r}")
+                entries.append((s, d, p, subj, r))
+    print("\n".join(lines))
 
     plot_schedule(
         entries=entries,